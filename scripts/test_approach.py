@@ -15,12 +15,15 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+import queue
+import threading
+
 import cv2
 import numpy as np
 from pathlib import Path
 
 from spatial_context import SpatialContext, MapConfig
-from transforms import pose_from_translation_quaternion
+from transforms import poses_from_translation_quaternion_batch
 
 
 # ============================================================================
@@ -55,32 +58,22 @@ def parse_timestamp(ts: str) -> int:
     return minutes * 60 + seconds
 
 
-def load_dpvo_poses(pose_file: str) -> list[np.ndarray]:
+def load_dpvo_poses(pose_file: str) -> np.ndarray:
     """
-    Load DPVO poses from file as ordered list.
-    
+    Load DPVO poses from file in order.
+
     Format: pose_idx tx ty tz qx qy qz qw
-    
+
     Note: DPVO poses may be sparse (generated with stride), so pose indices
     don't necessarily map 1:1 to video frame indices.
-    
+
     Returns:
-        List of SE(3) pose matrices in order
+        (N, 4, 4) array of SE(3) pose matrices in order
     """
-    poses = []
-    with open(pose_file, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) != 8:
-                continue
-            
-            tx, ty, tz = float(parts[1]), float(parts[2]), float(parts[3])
-            qx, qy, qz, qw = float(parts[4]), float(parts[5]), float(parts[6]), float(parts[7])
-            
-            pose = pose_from_translation_quaternion(tx, ty, tz, qx, qy, qz, qw)
-            poses.append(pose)
-    
-    return poses
+    # Single parse + vectorized quaternion->matrix conversion instead of
+    # per-line split/float/pose construction in Python
+    arr = np.loadtxt(pose_file, ndmin=2)
+    return poses_from_translation_quaternion_batch(arr[:, 1:4], arr[:, 4:8])
 
 
 def run_test(test_name: str, config: dict, output_dir: Path, project_root: Path):
@@ -141,19 +134,44 @@ def run_test(test_name: str, config: dict, output_dir: Path, project_root: Path)
     
     # Process video at OUTPUT_FPS Hz
     frame_step = VIDEO_FPS // OUTPUT_FPS  # Frames to skip between samples
-    output_frame_idx = 0
-    
+
+    # Decode on a producer thread so video decoding overlaps with map
+    # generation + encoding on the main thread: throughput is then bounded
+    # by max(decode, map) instead of their sum. The bounded queue keeps
+    # memory in check; a None sentinel signals end of stream.
+    frame_queue: queue.Queue = queue.Queue(maxsize=8)
+
+    def decode_frames():
+        # Decode sequentially instead of seeking: cap.set(CAP_PROP_POS_FRAMES)
+        # every iteration forces a decoder flush, which is pathological on
+        # H.264. Skipped frames are grab()'d (no decode); only target frames
+        # are decoded.
+        frame_idx = 0
+        next_target = 0
+        while frame_idx < total_frames:
+            if frame_idx != next_target:
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            next_target += frame_step
+            frame_queue.put((frame_idx, frame))
+            frame_idx += 1
+        frame_queue.put(None)
+
+    decoder = threading.Thread(target=decode_frames, daemon=True)
+    decoder.start()
+
     while True:
-        # Seek to frame
-        frame_idx = output_frame_idx * frame_step
-        if frame_idx >= total_frames:
-            break
-        
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
+        item = frame_queue.get()
+        if item is None:
             break
-        
+        frame_idx, frame = item
+
         # Current time in seconds
         current_second = frame_idx // VIDEO_FPS
         
@@ -181,24 +199,24 @@ def run_test(test_name: str, config: dict, output_dir: Path, project_root: Path)
         # Resize map to output size
         map_resized = cv2.resize(spatial_map, (map_size, map_size))
         
-        # Generate watermarked keyframes for newly promoted frame
+        # Watermark only the newly promoted frame (earlier keyframes were
+        # already watermarked and saved when they were promoted)
         if is_keyframe:
-            keyframes_list = [(fid, keyframe_images[fid]) for fid in promoted_frame_ids]
-            watermarked = ctx.watermark_keyframes(keyframes_list, colors)
-            
-            # Save the latest watermarked keyframe
+            kf_index = len(promoted_frame_ids) - 1
+            watermarked = ctx.watermark_keyframes([(frame_id, keyframe_images[frame_id])], colors,
+                                                  start_index=kf_index)
+
             latest_watermarked = watermarked[-1]
-            kf_path = output_dir / f"{test_name}_keyframe_{len(watermarked):02d}_{current_second}s.png"
+            kf_path = output_dir / f"{test_name}_keyframe_{kf_index + 1:02d}_{current_second}s.png"
             cv2.imwrite(str(kf_path), latest_watermarked)
             watermarked_keyframes.append(kf_path)
             print(f"      Saved watermarked keyframe: {kf_path.name}")
         
         # Write frame (map only)
         out.write(map_resized)
-        
-        output_frame_idx += 1
-    
+
     # Cleanup
+    decoder.join()
     cap.release()
     out.release()
     
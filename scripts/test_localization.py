@@ -51,6 +51,12 @@ def test_localization():
 
     cap = cv2.VideoCapture(video_path)
     frame_count = 0
+    tracked_count = 0
+
+    # Print a summary every N frames instead of per frame: per-frame
+    # stdout writes (syscall + GIL-held lock) add real latency to a
+    # 30 Hz loop
+    log_interval = 30
 
     print("\nProcessing video frames...")
 
@@ -66,14 +72,19 @@ def test_localization():
         robot_pose = localizer.update(frame, timestamp)
 
         if robot_pose is not None:
-            # Extract position
-            position = robot_pose[:3, 3]
-            print(f"Frame {frame_count}: Position = [{position[0]:.3f}, {position[1]:.3f}, {position[2]:.3f}]")
-        else:
-            print(f"Frame {frame_count}: Initializing...")
+            tracked_count += 1
 
         frame_count += 1
 
+        if frame_count % log_interval == 0:
+            if robot_pose is not None:
+                position = robot_pose[:3, 3]
+                print(f"Frames {frame_count - log_interval}-{frame_count - 1}: "
+                      f"tracked {tracked_count}/{frame_count}, "
+                      f"position = [{position[0]:.3f}, {position[1]:.3f}, {position[2]:.3f}]")
+            else:
+                print(f"Frames {frame_count - log_interval}-{frame_count - 1}: initializing...")
+
         # Limit frames for testing
         if frame_count >= 30:
             break
@@ -21,10 +21,7 @@ def main():
         np.array([0.4, -0.1, 0.3, -1.6, 0.3, 1.9, 0.4]),
     ]
 
-    frame_ids = []
-    for i, joints in enumerate(joint_states):
-        fid = ctx.add_frame(joints)
-        frame_ids.append(fid)
+    frame_ids = ctx.add_frames(np.stack(joint_states))
 
     # Promote all 8 frames to keyframes
     for fid in frame_ids:
@@ -36,11 +33,16 @@ def main():
 
     watermarked = ctx.watermark_keyframes([(i, keyframe) for i in range(8)], colors)
 
-    # Resize map to match keyframe height for side-by-side display
+    # Resize map to match keyframe height for side-by-side display.
+    # Write both tiles into one preallocated buffer (reusable across
+    # iterations in a live loop) instead of hstack allocating per call.
     kf_h, kf_w = watermarked[0].shape[:2]
-    map_resized = cv2.resize(map, (kf_h, kf_h))  # square map scaled to keyframe height
-    
-    combined = np.hstack([watermarked[0], map_resized])
+    map_resized = np.empty((kf_h, kf_h, 3), dtype=np.uint8)
+    cv2.resize(map, (kf_h, kf_h), dst=map_resized)  # square map scaled to keyframe height
+
+    combined = np.empty((kf_h, kf_w + kf_h, 3), dtype=np.uint8)
+    combined[:, :kf_w] = watermarked[0]
+    combined[:, kf_w:] = map_resized
     cv2.imshow("Keyframe + Map", combined)
     cv2.waitKey(0)
     cv2.destroyAllWindows()
@@ -115,10 +115,21 @@ class Localization:
             )
 
         self.intrinsics = camera_intrinsics
+
+        # intrinsics are immutable for the lifetime of the instance; build
+        # the device tensor once instead of on every update() call
+        self._intrinsics_t = (
+            torch.from_numpy(np.asarray(camera_intrinsics, dtype=np.float32))
+            .to(device)
+            .unsqueeze(0)
+        )
         self.camera_to_world = (
-            camera_to_world if camera_to_world is not None else np.eye(4)
+            np.asarray(camera_to_world, dtype=np.float32)
+            if camera_to_world is not None
+            else np.eye(4, dtype=np.float32)
         )
         self.device = device
+        self.weights_path = weights_path
 
         # Initialize DPVO
         self.dpvo = DPVO(weights=weights_path, device=device)
@@ -130,6 +141,63 @@ class Localization:
         # Minimum frames needed for DPVO to initialize
         self.min_init_frames = 5
 
+        # already-transformed world poses; get_trajectory only transforms
+        # the tail DPVO appended since the last call
+        self._world_poses_list: list = []
+        self._num_cached = 0
+
+        # Frame staging buffers for async H2D upload, lazily allocated on
+        # the first update once H, W are known: pinned host buffer plus
+        # reusable uint8/float32 device buffers so per-frame prep does no
+        # tensor allocation at all
+        self._rgb_host = None
+        self._rgb_u8_dev = None
+        self._rgb_dev = None
+
+        # fuse the cast + CHW reorder + normalize chain into one kernel
+        # where torch.compile is available (compilation happens lazily on
+        # the first frame); fall back to the eager two-kernel version
+        try:
+            self._prep = torch.compile(self._prep_eager, mode="reduce-overhead")
+        except Exception:
+            self._prep = self._prep_eager
+
+    @staticmethod
+    def _prep_eager(src: torch.Tensor, dst: torch.Tensor):
+        """Cast a (H, W, 3) uint8 tensor into a (3, H, W) [0, 1] float dst."""
+        dst.copy_(src.permute(2, 0, 1))
+        dst.div_(255.0)
+
+    def _stage_frame(self, rgb: np.ndarray) -> torch.Tensor:
+        """
+        Move a frame to the device through a reusable pinned staging buffer.
+
+        Pinned (page-locked) host memory lets the uint8 H2D copy run
+        asynchronously, and the uint8->float32 conversion + normalization
+        happen on the GPU instead of the CPU, so only a third of the bytes
+        cross PCIe per frame.
+
+        Args:
+            rgb: RGB image (H, W, 3) uint8
+
+        Returns:
+            (3, H, W) float32 tensor on self.device, normalized to [0, 1]
+        """
+        if self._rgb_host is None or self._rgb_host.shape != rgb.shape:
+            pin = self.device.startswith("cuda") and torch.cuda.is_available()
+            h, w = rgb.shape[:2]
+            self._rgb_host = torch.empty(rgb.shape, dtype=torch.uint8, pin_memory=pin)
+            self._rgb_u8_dev = torch.empty(rgb.shape, dtype=torch.uint8, device=self.device)
+            self._rgb_dev = torch.empty((3, h, w), dtype=torch.float32, device=self.device)
+
+        self._rgb_host.copy_(torch.from_numpy(rgb))
+        self._rgb_u8_dev.copy_(self._rgb_host, non_blocking=True)
+
+        # cast + CHW reorder + normalize, all on device into the reused buffer
+        self._prep(self._rgb_u8_dev, self._rgb_dev)
+
+        return self._rgb_dev
+
     def update(self, rgb: np.ndarray, timestamp: float) -> Optional[np.ndarray]:
         """
         Process a new frame and return the camera pose.
@@ -147,21 +215,16 @@ class Localization:
         # Convert to torch tensor and prepare for DPVO
         # DPVO expects CHW format, normalized to [0, 1]
         if isinstance(rgb, np.ndarray):
-            rgb_tensor = torch.from_numpy(rgb).permute(2, 0, 1).float() / 255.0
-            rgb_tensor = rgb_tensor.to(self.device)
+            rgb_tensor = self._stage_frame(rgb)
         else:
             rgb_tensor = rgb
 
         # Add batch dimension
         rgb_tensor = rgb_tensor.unsqueeze(0)
 
-        # Create intrinsics tensor
-        intrinsics_tensor = torch.from_numpy(self.intrinsics).float().to(self.device)
-        intrinsics_tensor = intrinsics_tensor.unsqueeze(0)
-
         # Process frame through DPVO
         with torch.no_grad():
-            self.dpvo(timestamp, rgb_tensor, intrinsics_tensor)
+            self.dpvo(timestamp, rgb_tensor, self._intrinsics_t)
 
         self.frame_count += 1
 
@@ -194,9 +257,17 @@ class Localization:
 
     def reset(self):
         """Reset the localization system."""
-        self.dpvo = DPVO(weights=self.dpvo.weights, device=self.device)
+        # Prefer an in-place state reset when the DPVO build exposes one;
+        # reconstructing re-reads the weights file from disk (tens of ms
+        # to seconds)
+        if hasattr(self.dpvo, "reset"):
+            self.dpvo.reset()
+        else:
+            self.dpvo = DPVO(weights=self.weights_path, device=self.device)
         self.is_initialized = False
         self.frame_count = 0
+        self._world_poses_list = []
+        self._num_cached = 0
 
     def get_trajectory(self) -> Optional[np.ndarray]:
         """
@@ -218,14 +289,22 @@ class Localization:
         if isinstance(poses, torch.Tensor):
             poses = poses.cpu().numpy()
         elif isinstance(poses, list):
-            poses = np.array(
+            poses = np.stack(
                 [p.cpu().numpy() if isinstance(p, torch.Tensor) else p for p in poses]
             )
 
-        # Transform all poses to world frame
-        world_poses = np.array([self.camera_to_world @ p for p in poses])
+        # Transform only the poses appended since the last call, with a
+        # single broadcast matmul over the new (dN, 4, 4) tail; earlier
+        # poses are served from the cache
+        new_poses = poses[self._num_cached:]
+        if len(new_poses) > 0:
+            self._world_poses_list.extend(self.camera_to_world @ new_poses)
+            self._num_cached = len(poses)
+
+        if not self._world_poses_list:
+            return None
 
-        return world_poses
+        return np.stack(self._world_poses_list)
 
     @staticmethod
     def create_camera_to_world_transform(
@@ -250,7 +329,7 @@ class Localization:
             ...     rotation=np.eye(3)
             ... )
         """
-        T = np.eye(4)
+        T = np.eye(4, dtype=np.float32)
 
         if translation is not None:
             if len(translation) != 3:
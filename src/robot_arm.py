@@ -1,63 +1,195 @@
+import functools
+import math
+
 import mujoco
 import numpy as np
 
-from transforms import transform_inverse, transform_is_valid
+from transforms import quaternion_to_rotation_matrix
 
 FR3_DEFINITION_PATH = "fr3v2/fr3v2.xml"
 
+
+@functools.lru_cache(maxsize=4)
+def _load_model(path: str) -> mujoco.MjModel:
+    """Parse and compile the MJCF once per path; XML parsing + model compile
+    is tens of ms and dominates construction when multiple RobotArm (and
+    thus SpatialContext) instances are created. The shared model is never
+    mutated -- all per-instance state lives in MjData."""
+    return mujoco.MjModel.from_xml_path(path)
+
+
 class RobotArm:
-    def __init__(self):
-        self.model = mujoco.MjModel.from_xml_path(str(FR3_DEFINITION_PATH))
+    def __init__(self, use_mujoco: bool = False):
+        self.model = _load_model(str(FR3_DEFINITION_PATH))
         self.data = mujoco.MjData(self.model)
 
-    def forward_kinematics(self, robot_state: np.ndarray):
-        if robot_state.shape != (7,):
-            raise ValueError(f"robot_state must have shape (7,), but got {robot_state.shape}")
-
-        # get which qpos corresponds to which joint
+        # cache which qpos corresponds to which joint once; scanning all
+        # joints on every forward_kinematics call is pure overhead since
+        # the model never changes
         hinge_qpos_addrs = []
-        hinge_names = []
         for j in range(self.model.njnt):
             if self.model.jnt_type[j] == mujoco.mjtJoint.mjJNT_HINGE:
                 hinge_qpos_addrs.append(self.model.jnt_qposadr[j])
-                hinge_names.append(mujoco.mj_id2name(self.model, mujoco.mjtObj.mjOBJ_JOINT, j))
 
         if len(hinge_qpos_addrs) < 7:
             raise RuntimeError(f"Expected >=7 hinge joints, found {len(hinge_qpos_addrs)}")
-        
-        # set robot state values to the model
-        for i in range(7):
-            self.data.qpos[hinge_qpos_addrs[i]] = robot_state[i]
 
-        # run forward kinematics
-        mujoco.mj_forward(self.model, self.data)
+        self._hinge_qpos_addrs = np.array(hinge_qpos_addrs[:7], dtype=np.int32)
 
-        # extract the end-effector pose from the library
+        # cache the end-effector body id
         ee_body_name = "fr3v2_link8"
-        ee_body_id = mujoco.mj_name2id(self.model, mujoco.mjtObj.mjOBJ_BODY, ee_body_name)
+        self._ee_body_id = mujoco.mj_name2id(self.model, mujoco.mjtObj.mjOBJ_BODY, ee_body_name)
 
-        if ee_body_id == -1:
+        if self._ee_body_id == -1:
             raise ValueError(f"Body {ee_body_name} not found")
 
-        pos = self.data.xpos[ee_body_id].copy() # (3, )
-        R = self.data.xmat[ee_body_id].reshape(3, 3).copy() # (3, 3)
+        # fold the kinematic chain into straight-line form once; the
+        # per-call FK is then 7 Rodrigues rotations + small matmuls with
+        # no MuJoCo pipeline involvement. use_mujoco=True keeps MuJoCo as
+        # the per-call evaluator (reference/fallback path).
+        self._use_mujoco = use_mujoco
+        self._fk_chain = self._build_fk_chain()
+
+    def _build_fk_chain(self):
+        """
+        Precompute the base-to-end-effector chain from the compiled model.
+
+        All fixed body transforms between consecutive hinges are folded into
+        the joint that follows them, and each joint's Rodrigues expansion is
+        pre-multiplied by that folded transform, so the per-call local
+        rotation/translation become element-wise combinations of constants:
+
+            R_local(q) = R0 + sin(q - q0) * A + (1 - cos(q - q0)) * B
+            t_local(q) = t0 - sin(q - q0) * a - (1 - cos(q - q0)) * b
+
+        Returns:
+            joints: list of (state_index, q0, R0, A, B, t0, a, b) per hinge
+            tail: fixed (4, 4) transform from the last hinge to the EE body
+        """
+        m = self.model
+
+        chain = []
+        body_id = self._ee_body_id
+        while body_id != 0:
+            chain.append(body_id)
+            body_id = int(m.body_parentid[body_id])
+        chain.reverse()
+
+        addr_to_idx = {int(a): i for i, a in enumerate(self._hinge_qpos_addrs)}
+
+        joints = []
+        pending = np.eye(4)  # fixed transform accumulated since the last hinge
+
+        for b in chain:
+            B_body = np.eye(4)
+            # body_quat is MuJoCo scalar-first (w, x, y, z)
+            w, x, y, z = m.body_quat[b]
+            B_body[:3, :3] = quaternion_to_rotation_matrix(x, y, z, w)
+            B_body[:3, 3] = m.body_pos[b]
+            pending = pending @ B_body
+
+            for j in range(m.body_jntadr[b], m.body_jntadr[b] + m.body_jntnum[b]):
+                if m.jnt_type[j] != mujoco.mjtJoint.mjJNT_HINGE:
+                    continue
+                adr = int(m.jnt_qposadr[j])
+                if adr not in addr_to_idx:
+                    continue
+
+                ax, ay, az = m.jnt_axis[j]
+                anchor = m.jnt_pos[j].copy()
+                K = np.array([
+                    [0.0, -az, ay],
+                    [az, 0.0, -ax],
+                    [-ay, ax, 0.0],
+                ])
+
+                R0 = pending[:3, :3].copy()
+                A = R0 @ K
+                B = A @ K  # R0 @ K^2
+
+                joints.append((
+                    addr_to_idx[adr],
+                    float(m.qpos0[adr]),
+                    R0, A, B,
+                    pending[:3, 3].copy(),
+                    A @ anchor,
+                    B @ anchor,
+                ))
+                pending = np.eye(4)
+
+        return joints, pending
+
+    def forward_kinematics(self, robot_state: np.ndarray):
+        if robot_state.shape != (7,):
+            raise ValueError(f"robot_state must have shape (7,), but got {robot_state.shape}")
+
+        if self._use_mujoco:
+            return self._forward_kinematics_mujoco(robot_state)
+
+        joints, tail = self._fk_chain
+
+        R_w = np.eye(3)
+        t_w = np.zeros(3)
+
+        for idx, q0, R0, A, B, t0, a, b in joints:
+            theta = robot_state[idx] - q0
+            s = math.sin(theta)
+            c1 = 1.0 - math.cos(theta)
+
+            R_local = R0 + s * A + c1 * B
+            t_local = t0 - s * a - c1 * b
+
+            t_w = t_w + R_w @ t_local
+            R_w = R_w @ R_local
 
-        # concat into SE(3) transform matrix
         T = np.eye(4)
-        T[:3, :3] = R
-        T[:3, 3] = pos
+        T[:3, :3] = R_w @ tail[:3, :3]
+        T[:3, 3] = t_w + R_w @ tail[:3, 3]
 
         return T
 
+    def _forward_kinematics_mujoco(self, robot_state: np.ndarray):
+        """Reference FK through MuJoCo's position-kinematics pass."""
+        # set robot state values to the model (single vectorized assign)
+        self.data.qpos[self._hinge_qpos_addrs] = robot_state
 
+        # run only the position-kinematics pass; mj_forward also evaluates
+        # velocities, actuation, and constraints, none of which are needed
+        # to read a body pose
+        mujoco.mj_kinematics(self.model, self.data)
 
+        # extract the end-effector pose from the library
+        pos = self.data.xpos[self._ee_body_id].copy() # (3, )
+        R = self.data.xmat[self._ee_body_id].reshape(3, 3).copy() # (3, 3)
 
+        # concat into SE(3) transform matrix
+        T = np.eye(4)
+        T[:3, :3] = R
+        T[:3, 3] = pos
 
+        return T
 
+    def forward_kinematics_batch(self, robot_states: np.ndarray) -> np.ndarray:
+        """
+        Forward kinematics for a batch of joint configurations.
 
-        
+        Evaluates one configuration at a time, but batching here amortizes
+        validation and per-call Python overhead, and writes all results
+        into one contiguous output array.
 
+        Args:
+            robot_states: (N, 7) joint angles
 
+        Returns:
+            (N, 4, 4) end-effector poses
+        """
+        robot_states = np.asarray(robot_states)
+        if robot_states.ndim != 2 or robot_states.shape[1] != 7:
+            raise ValueError(f"robot_states must have shape (N, 7), but got {robot_states.shape}")
 
+        T = np.empty((len(robot_states), 4, 4))
 
+        for i, q in enumerate(robot_states):
+            T[i] = self.forward_kinematics(q)
 
+        return T
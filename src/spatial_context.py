@@ -1,10 +1,10 @@
 from dataclasses import dataclass
 import math
+
 import numpy as np
 import cv2
 
 from robot_arm import RobotArm
-from transforms import compute_relative_pose, extract_displacement
 
 """
 SpatialContext is the main class that directly interfaces with the MemER high-level policy.
@@ -27,20 +27,79 @@ class MapConfig:
 
 DEFAULT_MAP_CONFIG = MapConfig()
 
+# Saturated base colors (BGR for OpenCV)
+_BASE_COLORS = (
+    ( 25,  25, 230),  # red
+    ( 60, 180,  75),  # green
+    (200, 130,   0),  # blue
+    ( 48, 130, 245),  # orange
+    (180,  30, 145),  # purple
+    (240, 240,  70),  # cyan
+    (230,  50, 240),  # magenta
+    ( 60, 245, 210),  # yellow
+)
+
+_WHITEWASH = 0.45  # ↓ reduce if you want stronger colors
+
+# Whitewash baked in once at import; the per-keyframe lookup is then a
+# plain tuple index instead of rebuilding the list + 3 casts per call
+_KEYFRAME_PALETTE = tuple(
+    (
+        int(b + (255 - b) * _WHITEWASH),
+        int(g + (255 - g) * _WHITEWASH),
+        int(r + (255 - r) * _WHITEWASH),
+    )
+    for (b, g, r) in _BASE_COLORS
+)
+
+# Unit (cos, sin) candidate tables for each spiral ring of
+# _resolve_overlap, computed once at import; ring r probes max(8, 8r)
+# evenly spaced angles
+_RING_TABLES = tuple(
+    np.stack([np.cos(a), np.sin(a)], axis=1)
+    for a in (
+        np.linspace(0.0, 2.0 * np.pi, max(8, ring * 8), endpoint=False)
+        for ring in range(1, 10)
+    )
+)
+
 
 class SpatialContext:
-    def __init__(self, relocalization: bool = False, map_config: MapConfig = None, avoid_overlap: bool = True):
+    def __init__(self, relocalization: bool = False, map_config: MapConfig = None, avoid_overlap: bool = True,
+                 history_size: int = 1024):
         self.relocalization = relocalization
         self.map_config = map_config or DEFAULT_MAP_CONFIG
         self.avoid_overlap = avoid_overlap
-        
-        # maps frame_id to SE(3) pose
-        self.keyframe_poses: dict[int, np.ndarray] = {}
-        self.all_poses: dict[int, np.ndarray] = {}
+
+        # number of recent poses retained; at camera rate (30 Hz) unbounded
+        # per-frame storage grows forever even though only keyframes and
+        # the current pose are ever read back
+        self.history_size = history_size
+
+        # SoA pose storage: one contiguous (cap, 4, 4) float32 ring buffer
+        # indexed by frame_id % cap, with a parallel id array to detect
+        # overwritten slots. Replaces a dict of scattered 4x4 allocations.
+        self._pose_buf = np.empty((history_size, 4, 4), dtype=np.float32)
+        self._pose_ids = np.full(history_size, -1, dtype=np.int64)
+
+        # keyframe poses stacked as (K, 4, 4) with parallel ids; copies, so
+        # they survive ring overwrites and the map layout runs as one
+        # batched matmul instead of a per-keyframe Python loop
+        self._kf_ids: list[int] = []
+        self._kf_poses_arr = np.empty((0, 4, 4), dtype=np.float32)
 
         # track current frame for id assignment
         self._frame_count = 0
 
+        # closed-form inverse of the newest pose, refreshed at frame
+        # ingestion (the only place the current pose changes) so
+        # generate_map pays nothing for it
+        self._current_inv = np.eye(4, dtype=np.float32)
+
+        # reusable BEV canvas; generate_map clears it with a memset-backed
+        # fill instead of allocating ~768 KB per call
+        self._canvas = np.empty((self.map_config.image_size, self.map_config.image_size, 3), dtype=np.uint8)
+
         # initialize utils for pose
         self.robot_arm = RobotArm()
 
@@ -50,10 +109,13 @@ class SpatialContext:
 
         Note that the robot_pose origin must the base of the robot arm.
         """
+        ee_pose_robot_frame = self.robot_arm.forward_kinematics(robot_state)
+
+        # without a SLAM base pose the world frame is the robot frame;
+        # skip the identity matmul
         if robot_pose is None:
-            robot_pose = np.eye(4)
+            return ee_pose_robot_frame
 
-        ee_pose_robot_frame = self.robot_arm.forward_kinematics(robot_state)
         ee_pose_world_frame = robot_pose @ ee_pose_robot_frame
 
         return ee_pose_world_frame
@@ -72,11 +134,43 @@ class SpatialContext:
         frame_id = self._frame_count
         self._frame_count += 1
 
-        pose = self._compute_pose(robot_state, robot_pose)
-        self.all_poses[frame_id] = pose
+        # stored as float32: poses only feed the BEV rasterizer, so float64
+        # precision is wasted bytes and cache bandwidth
+        self._store_pose(frame_id, self._compute_pose(robot_state, robot_pose))
 
         return frame_id
 
+    def add_frames(self, robot_states: np.ndarray, robot_poses: np.ndarray = None) -> list[int]:
+        """
+        Compute and store poses for a batch of frames.
+
+        One batched FK call plus a single broadcast matmul replaces a
+        Python round trip per frame; useful for trajectory replays.
+
+        Args:
+            robot_states: (N, 7) joint angles
+            robot_poses: Optional (N, 4, 4) robot base poses from SLAM
+
+        Returns:
+            frame_ids: The IDs assigned to the frames, in order
+        """
+        ee_poses = self.robot_arm.forward_kinematics_batch(robot_states)
+
+        if robot_poses is not None:
+            # matmul broadcasts over the leading batch dimension
+            ee_poses = robot_poses @ ee_poses
+
+        frame_ids = list(range(self._frame_count, self._frame_count + len(ee_poses)))
+        self._frame_count += len(ee_poses)
+
+        rows = np.asarray(frame_ids, dtype=np.int64) % self.history_size
+        self._pose_buf[rows] = ee_poses
+        self._pose_ids[rows] = frame_ids
+        if len(ee_poses):
+            self._update_current_inv(ee_poses[-1])
+
+        return frame_ids
+
     def add_frame_with_pose(self, pose: np.ndarray) -> int:
         """
         Store a pre-computed pose directly (bypasses forward kinematics).
@@ -93,35 +187,75 @@ class SpatialContext:
         frame_id = self._frame_count
         self._frame_count += 1
 
-        self.all_poses[frame_id] = pose
+        self._store_pose(frame_id, pose)
 
         return frame_id
 
+    def _store_pose(self, frame_id: int, pose: np.ndarray):
+        """Write a pose into the ring buffer slot for frame_id."""
+        row = frame_id % self.history_size
+        self._pose_buf[row] = pose  # casts to float32 on assignment
+        self._pose_ids[row] = frame_id
+        self._update_current_inv(pose)
+
+    def _update_current_inv(self, pose: np.ndarray):
+        """Refresh the cached [R.T | -R.T t] inverse of the newest pose."""
+        R_T = pose[:3, :3].T
+        self._current_inv[:3, :3] = R_T
+        self._current_inv[:3, 3] = -(R_T @ pose[:3, 3])
+
+    def _lookup_pose(self, frame_id: int) -> np.ndarray:
+        """Return the stored pose for frame_id, or None if it was evicted."""
+        row = frame_id % self.history_size
+        if self._pose_ids[row] != frame_id:
+            return None
+        return self._pose_buf[row]
+
+    @property
+    def all_poses(self) -> dict[int, np.ndarray]:
+        """Dict view of the retained (recent) poses, oldest first."""
+        live = np.sort(self._pose_ids[self._pose_ids >= 0])
+        return {int(fid): self._pose_buf[fid % self.history_size] for fid in live}
+
+    @property
+    def keyframe_poses(self) -> dict[int, np.ndarray]:
+        """Dict view of the keyframe poses, in promotion order."""
+        return {fid: self._kf_poses_arr[i] for i, fid in enumerate(self._kf_ids)}
+
     def promote_to_keyframe(self, frame_id: int):
         """Promote a frame to keyframe status."""
-        if frame_id not in self.all_poses:
+        if frame_id in self._kf_ids:
+            return
+        pose = self._lookup_pose(frame_id)
+        if pose is None:
             raise ValueError(f"Frame {frame_id} not found")
-        self.keyframe_poses[frame_id] = self.all_poses[frame_id]
+        self._kf_ids.append(frame_id)
+        self._kf_poses_arr = np.concatenate([self._kf_poses_arr, pose[None].copy()], axis=0)
 
     def remove_keyframe(self, frame_id: int):
         """Remove a keyframe."""
-        self.keyframe_poses.pop(frame_id, None)
+        if frame_id in self._kf_ids:
+            idx = self._kf_ids.index(frame_id)
+            self._kf_ids.pop(idx)
+            self._kf_poses_arr = np.delete(self._kf_poses_arr, idx, axis=0)
 
     def get_current_pose(self) -> np.ndarray:
         """Get the most recent pose (current robot position)."""
-        if not self.all_poses:
-            return np.eye(4)
-        latest_id = max(self.all_poses.keys())
-        return self.all_poses[latest_id]
+        if self._frame_count == 0:
+            return np.eye(4, dtype=np.float32)
+        return self._pose_buf[(self._frame_count - 1) % self.history_size]
 
 
-    def watermark_keyframes(self, keyframes: list[tuple[int, np.ndarray]], colors: dict[int, tuple[int, int, int]]) -> list[np.ndarray]:
+    def watermark_keyframes(self, keyframes: list[tuple[int, np.ndarray]], colors: dict[int, tuple[int, int, int]],
+                            start_index: int = 0) -> list[np.ndarray]:
         """
         Watermarks the keyframes such that they match the map colors.
 
         Args:
             keyframes: list of (frame_id, keyframe_image) pairs
             colors: dictionary mapping frame_id to color
+            start_index: label offset for the first keyframe (lets callers
+                watermark only newly promoted frames without relabeling)
 
         Returns:
             list[np.ndarray] of H,W,3 watermarked images
@@ -130,7 +264,7 @@ class SpatialContext:
         
         watermarked = []
         
-        for idx, (fid, keyframe) in enumerate(keyframes):
+        for idx, (fid, keyframe) in enumerate(keyframes, start=start_index):
             if fid not in colors:
                 raise ValueError(f"Color for frame_id {fid} was not found")
             
@@ -158,11 +292,9 @@ class SpatialContext:
             text_x = padding + (size - text_size[0]) // 2
             text_y = padding + (size + text_size[1]) // 2
 
-            # add text twice for boldness
-            cv2.putText(img, label, (text_x + 1, text_y - 1),
-                        cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), thickness, cv2.LINE_AA)
+            # thicker stroke instead of double-rendering for boldness
             cv2.putText(img, label, (text_x, text_y - 1),
-                        cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), thickness, cv2.LINE_AA)
+                        cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), thickness + 1, cv2.LINE_AA)
             
             watermarked.append(img)
         
@@ -188,122 +320,126 @@ class SpatialContext:
         
         return usable_radius / max_dist
 
-    def _compute_map_layout(self, current_pose: np.ndarray) -> tuple[dict, float, set]:
+    def _compute_map_layout(self) -> tuple[np.ndarray, np.ndarray, float, np.ndarray]:
         """
         Compute relative XY positions and determine scale + outliers.
-        
+
+        Rows follow keyframe promotion order (same order as self._kf_ids),
+        so callers index by row rather than by frame_id.
+
         Returns:
-            positions: dict[frame_id, (x, y)] for keyframes
+            xy: (K, 2) keyframe positions relative to the current pose
+            forward: (K, 2) camera forward (Z-axis) projected onto XY
             scale: pixels per meter
-            outlier_ids: set of frame_ids that are outliers
+            outlier_mask: (K,) bool, True for outlier keyframes
         """
-        positions = {}
-        
-        for frame_id, pose in self.keyframe_poses.items():
-            rel_pose = compute_relative_pose(current_pose, pose)
-            x, y = extract_displacement(rel_pose)[:-1]
-            positions[frame_id] = (x, y)
-        
-        if len(positions) == 0:
-            return {}, 50.0, set()
-        
-        # compute distances
-        distances = {fid: np.sqrt(x**2 + y**2) for fid, (x, y) in positions.items()}
-        dist_values = list(distances.values())
-        
+        if not self._kf_ids:
+            empty2 = np.empty((0, 2), dtype=np.float32)
+            return empty2, empty2, 50.0, np.zeros(0, dtype=bool)
+
+        # batched relative pose across all K keyframes in one broadcast
+        # matmul against the cached current-pose inverse (maintained at
+        # frame ingestion, so nothing is inverted here). BEV needs the XY
+        # translation plus the XY projection of the camera forward axis
+        # for arrows.
+        rel = self._current_inv @ self._kf_poses_arr
+        xy = rel[:, :2, 3]
+        forward = rel[:, :2, 2]
+
+        # distances, statistics, and the outlier mask all run on the (K,)
+        # array directly -- no dict/list intermediates or conversions
+        dist = np.hypot(xy[:, 0], xy[:, 1])
+
         MIN_SAMPLES_FOR_OUTLIER = 5
-        
-        if len(dist_values) < MIN_SAMPLES_FOR_OUTLIER:
-            max_dist = max(dist_values) if dist_values else 1.0
-            scale = self._compute_scale(max_dist)
-            return positions, scale, set()
-        
-        # compute statistics
-        mean_dist = np.mean(dist_values)
-        std_dist = np.std(dist_values)
-        
+
+        if len(dist) < MIN_SAMPLES_FOR_OUTLIER:
+            scale = self._compute_scale(float(dist.max()))
+            return xy, forward, scale, np.zeros(len(dist), dtype=bool)
+
+        mean_dist = dist.mean()
+        std_dist = dist.std()
+
         if std_dist < 1e-6:
-            scale = self._compute_scale(max(dist_values))
-            return positions, scale, set()
-        
-        # threshold for outliers
-        threshold = mean_dist + self.map_config.outlier_std_threshold * std_dist
-        
-        # identify outliers
-        outlier_ids = {fid for fid, d in distances.items() if d > threshold}
-        
+            scale = self._compute_scale(float(dist.max()))
+            return xy, forward, scale, np.zeros(len(dist), dtype=bool)
+
+        # identify outliers with a single boolean mask
+        outlier_mask = dist > mean_dist + self.map_config.outlier_std_threshold * std_dist
+
         # scale based on inliers
-        inlier_distances = [d for fid, d in distances.items() if fid not in outlier_ids]
-        max_inlier_dist = max(inlier_distances) if inlier_distances else max(dist_values)
-        
+        inlier_dist = dist[~outlier_mask]
+        max_inlier_dist = float(inlier_dist.max()) if inlier_dist.size else float(dist.max())
+
         scale = self._compute_scale(max_inlier_dist)
-        
-        return positions, scale, outlier_ids
+
+        return xy, forward, scale, outlier_mask
 
     def _get_keyframe_color(self, index: int) -> tuple[int, int, int]:
         """
         Get color for keyframe by index (cycles through 8 colors).
         Colors are OpenCV BGR and lightly whitewashed for readability.
         """
-
-        # Saturated base colors (BGR for OpenCV)
-        base_colors = [
-            ( 25,  25, 230),  # red
-            ( 60, 180,  75),  # green
-            (200, 130,   0),  # blue
-            ( 48, 130, 245),  # orange
-            (180,  30, 145),  # purple
-            (240, 240,  70),  # cyan
-            (230,  50, 240),  # magenta
-            ( 60, 245, 210),  # yellow
-        ]
-
-        WHITEWASH = 0.45  # ↓ reduce if you want stronger colors
-
-        b, g, r = base_colors[index % len(base_colors)]
-
-        return (
-            int(b + (255 - b) * WHITEWASH),
-            int(g + (255 - g) * WHITEWASH),
-            int(r + (255 - r) * WHITEWASH),
-        )
+        # len(_KEYFRAME_PALETTE) == 8, so the modulo is a bitmask
+        return _KEYFRAME_PALETTE[index & 7]
 
 
     def _resolve_overlap(self, px: int, py: int, placed: list[tuple[int, int, int]], radius: int = 10) -> tuple[int, int]:
         """
         Resolve overlap by finding a nearby free position.
-        
+
+        Collision tests are vectorized: each candidate ring is broadcast
+        against all placed circles in one NumPy comparison instead of a
+        Python loop per candidate per circle.
+
         Args:
             px, py: Initial position
             placed: List of (x, y, radius) for already placed circles
             radius: Radius of circle to place
-            
+
         Returns:
             (px, py): Adjusted position that doesn't overlap
         """
-        def has_collision(x: int, y: int) -> bool:
-            for ox, oy, oradius in placed:
-                dist = math.sqrt((x - ox)**2 + (y - oy)**2)
-                min_dist = radius + oradius  # touching (no gap)
-                if dist < min_dist:
-                    return True
-            return False
-        
-        if not has_collision(px, py):
+        placed_arr = np.asarray(placed, dtype=np.float64)
+        cx = placed_arr[:, 0]
+        cy = placed_arr[:, 1]
+        # minimum separation per placed circle (touching = no gap)
+        rsum = placed_arr[:, 2] + radius
+        min_d2 = rsum ** 2
+
+        def first_free(xs: np.ndarray, ys: np.ndarray) -> int:
+            # (C, M) pairwise tests; a candidate is free when no placed
+            # circle is closer than the summed radii. Cheap axis-aligned
+            # bbox reject first: a circle can only collide if it is within
+            # rsum on both axes, so candidate rows with no bbox hit (the
+            # common case once the spiral moves outward) skip the
+            # squared-distance evaluation entirely.
+            adx = np.abs(xs[:, None] - cx)
+            ady = np.abs(ys[:, None] - cy)
+            maybe = (adx < rsum) & (ady < rsum)
+            rows = np.flatnonzero(maybe.any(axis=1))
+
+            blocked = np.zeros(len(xs), dtype=bool)
+            if rows.size:
+                d2 = adx[rows] ** 2 + ady[rows] ** 2
+                blocked[rows] = (d2 < min_d2).any(axis=1)
+
+            free = np.flatnonzero(~blocked)
+            return int(free[0]) if free.size else -1
+
+        if first_free(np.array([px]), np.array([py])) == 0:
             return px, py
-        
-        # Spiral outward to find free position
+
+        # Spiral outward to find free position; angle tables for every
+        # ring are precomputed at module scope
         step = radius
-        for ring in range(1, 10):  # Try up to 10 rings out
+        for ring, unit_cs in enumerate(_RING_TABLES, start=1):
             dist = ring * step
-            num_points = max(8, ring * 8)  # More points for larger rings
-            for i in range(num_points):
-                angle = (2 * math.pi * i) / num_points
-                nx = px + int(dist * math.cos(angle))
-                ny = py + int(dist * math.sin(angle))
-                if not has_collision(nx, ny):
-                    return nx, ny
-        
+            nx = px + (dist * unit_cs[:, 0]).astype(int)
+            ny = py + (dist * unit_cs[:, 1]).astype(int)
+            idx = first_free(nx, ny)
+            if idx >= 0:
+                return int(nx[idx]), int(ny[idx])
+
         # Fallback: just offset to the right
         return px + radius * 3, py
 
@@ -312,79 +448,114 @@ class SpatialContext:
         Generate egocentric BEV map showing current position and keyframes.
         
         Returns:
-            RGB image (H, W, 3) uint8
+            RGB image (H, W, 3) uint8 -- a reused internal buffer that is
+            overwritten by the next generate_map call; copy it to retain
             Color Dictionary (maps fid to color) dict[int, tuple[int, int, int]]
         """
         cfg = self.map_config
-        current_pose = self.get_current_pose()
-        positions, scale, outlier_ids = self._compute_map_layout(current_pose)
-        
-        # Create white canvas
-        image = np.full((cfg.image_size, cfg.image_size, 3), 255, dtype=np.uint8)
+        xy, forward, scale, outlier_mask = self._compute_map_layout()
+
+        # Reset the reusable canvas to white
+        image = self._canvas
+        image.fill(255)
         
         center = cfg.image_size // 2
-        
+
         # track placed circles: (x, y, radius)
         placed_circles: list[tuple[int, int, int]] = [(center, center, cfg.robot_radius)]
-        
+
         # draw keyframes
-        keyframe_ids = list(self.keyframe_poses.keys())
+        keyframe_ids = self._kf_ids
+
+        # project and clamp all keyframe pixel coordinates in one pass;
+        # scalar np.clip in the loop would pay a ufunc dispatch per call
+        lo = cfg.border_size + cfg.keyframe_radius
+        hi = cfg.image_size - cfg.border_size - cfg.keyframe_radius
+        px_arr = center + (xy[:, 0] * scale).astype(np.int32)
+        py_arr = center + (xy[:, 1] * scale).astype(np.int32)  # Note: DPVO Y axis is inverted from expected
+        np.clip(px_arr, lo, hi, out=px_arr)
+        np.clip(py_arr, lo, hi, out=py_arr)
 
         # track colors that were used for each keyframe
         colors: dict[int, tuple[int, int, int]] = {}
-        
+
+        half = cfg.keyframe_radius
+
+        # placement pass: overlap resolution is inherently sequential
+        # (each keyframe must see where the previous ones landed), so only
+        # the positions are decided here; all drawing is batched below
         for i, frame_id in enumerate(keyframe_ids):
-            color = self._get_keyframe_color(i)
-            colors[frame_id] = color
-            x, y = positions[frame_id]
-            
-            px = center + int(x * scale)
-            py = center + int(y * scale)  # Note: DPVO Y axis is inverted from expected
-            
-            # clamp to border edge
-            px = int(np.clip(px, cfg.border_size + cfg.keyframe_radius, cfg.image_size - cfg.border_size - cfg.keyframe_radius))
-            py = int(np.clip(py, cfg.border_size + cfg.keyframe_radius, cfg.image_size - cfg.border_size - cfg.keyframe_radius))
-            
+            colors[frame_id] = self._get_keyframe_color(i)
+
+            px = int(px_arr[i])
+            py = int(py_arr[i])
+
             # resolve overlaps with robot and other keyframes (if enabled)
             if self.avoid_overlap:
                 px, py = self._resolve_overlap(px, py, placed_circles, cfg.keyframe_radius)
-                
-                # clamp again after adjustment
-                px = int(np.clip(px, cfg.border_size + cfg.keyframe_radius, cfg.image_size - cfg.border_size - cfg.keyframe_radius))
-                py = int(np.clip(py, cfg.border_size + cfg.keyframe_radius, cfg.image_size - cfg.border_size - cfg.keyframe_radius))
-            
+
+                # clamp again after adjustment (plain min/max on scalars)
+                px = min(max(px, lo), hi)
+                py = min(max(py, lo), hi)
+
+                px_arr[i] = px
+                py_arr[i] = py
+
             # add to placed circles
             placed_circles.append((px, py, cfg.keyframe_radius))
-            
-            # draw marker (square)
-            half = cfg.keyframe_radius
-            top_left = (px - half, py - half)
-            bottom_right = (px + half, py + half)
-            cv2.rectangle(image, top_left, bottom_right, color, -1)
-            cv2.rectangle(image, top_left, bottom_right, (0, 0, 0), cfg.circle_border_size)
-            
+
+        if len(keyframe_ids):
+            # stamp all filled squares with one fancy-indexed write: the
+            # markers are fixed-size, so broadcast the per-keyframe colors
+            # over a (K, 2h+1, 2h+1) grid of destination indices (clamps
+            # above keep every stamp in-bounds)
+            ys, xs = np.mgrid[-half:half + 1, -half:half + 1]
+            dst_y = py_arr[:, None, None] + ys
+            dst_x = px_arr[:, None, None] + xs
+            stamp_colors = np.array([colors[fid] for fid in keyframe_ids], dtype=np.uint8)
+            image[dst_y, dst_x] = stamp_colors[:, None, None, :]
+
+            # all outlines in one polylines call
+            rects = np.empty((len(keyframe_ids), 4, 2), dtype=np.int32)
+            rects[:, 0, 0] = px_arr - half
+            rects[:, 0, 1] = py_arr - half
+            rects[:, 1, 0] = px_arr + half
+            rects[:, 1, 1] = py_arr - half
+            rects[:, 2, 0] = px_arr + half
+            rects[:, 2, 1] = py_arr + half
+            rects[:, 3, 0] = px_arr - half
+            rects[:, 3, 1] = py_arr + half
+            cv2.polylines(image, rects, True, (0, 0, 0), cfg.circle_border_size)
+
+        # labels and orientation arrows (text/line rasterization stays in
+        # OpenCV)
+        for i in range(len(keyframe_ids)):
+            px = int(px_arr[i])
+            py = int(py_arr[i])
+
             # draw label
             label = str(i + 1)
             text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, cfg.font_scale, 1)[0]
             text_x = px - text_size[0] // 2
             text_y = py + text_size[1] // 2
 
-            # added twice for bold
-            cv2.putText(image, label, (text_x-1, text_y - 1),
-                        cv2.FONT_HERSHEY_SIMPLEX, cfg.font_scale, (0, 0, 0), 1, cv2.LINE_AA)
+            # thicker stroke instead of double-rendering for boldness
             cv2.putText(image, label, (text_x, text_y - 1),
-                        cv2.FONT_HERSHEY_SIMPLEX, cfg.font_scale, (0, 0, 0), 1, cv2.LINE_AA)
-            
-            # draw orientation arrow showing camera direction at this keyframe
-            rel_pose = compute_relative_pose(current_pose, self.keyframe_poses[frame_id])
-            rotation = rel_pose[:3, :3]
-            # camera forward is Z-axis (third column of rotation matrix)
-            forward = rotation[:, 2]
-            # project onto XY plane for BEV
-            fwd_x, fwd_y = forward[0], forward[1]
-            length = np.sqrt(fwd_x**2 + fwd_y**2)
-            if length > 1e-6:
-                fwd_x, fwd_y = fwd_x / length, fwd_y / length
+                        cv2.FONT_HERSHEY_SIMPLEX, cfg.font_scale, (0, 0, 0), 2, cv2.LINE_AA)
+
+            # draw orientation arrow showing camera direction at this
+            # keyframe; the XY-projected forward axis comes from the same
+            # batched relative-pose computation as the layout
+            fwd_x = float(forward[i, 0])
+            fwd_y = float(forward[i, 1])
+            # compare squared magnitude first so near-vertical cameras skip
+            # the sqrt; math.sqrt on a Python float avoids the 0-d array
+            # round-trip np.sqrt would pay per keyframe
+            length_sq = fwd_x * fwd_x + fwd_y * fwd_y
+            if length_sq > 1e-12:
+                inv_len = 1.0 / math.sqrt(length_sq)
+                fwd_x *= inv_len
+                fwd_y *= inv_len
                 arrow_len = cfg.keyframe_radius + 8
                 # start arrow from corner of square in the direction of the arrow
                 start_x = px + int(fwd_x * half * 0.7)
@@ -393,7 +564,7 @@ class SpatialContext:
                 end_y = start_y + int(fwd_y * arrow_len)
                 cv2.arrowedLine(image, (start_x, start_y), (end_x, end_y),
                                 (0, 0, 0), 2, cv2.LINE_AA, tipLength=0.35)
-        
+
         # draw robot at center
         cv2.circle(image, (center, center), cfg.robot_radius, (180, 180, 180), -1)
         cv2.circle(image, (center, center), cfg.robot_radius, (100, 100, 100), cfg.circle_border_size)
